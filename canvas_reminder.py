@@ -0,0 +1,896 @@
+# canvas_reminder.py
+# Flags missing and low-score Q3/Q4 Canvas assignments and posts them to Discord.
+
+import json
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from bisect import bisect_right
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+from unittest import mock
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:  # optional; falls back to stdlib json
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # optional; records fall back to a namedtuple
+    msgspec = None
+
+try:
+    import httpx
+except ImportError:  # optional; Canvas calls fall back to the requests session
+    httpx = None
+
+# ========= CONFIG =========
+# Secrets must come from environment variables (safe for public GitHub repos).
+CANVAS_BASE = os.getenv("CANVAS_BASE")
+CANVAS_TOKEN = os.getenv("CANVAS_TOKEN")
+DISCORD_WEBHOOK_URL = os.getenv("DISCORD_WEBHOOK_URL")
+
+if not CANVAS_BASE or not CANVAS_TOKEN:
+    raise RuntimeError(
+        "Missing configuration. Set CANVAS_BASE and CANVAS_TOKEN as environment variables. "
+        "For local use, export them in your shell or use a .env loader."
+    )
+# ===========================
+
+HEADERS = {"Authorization": f"Bearer {CANVAS_TOKEN}"}
+
+# Canvas endpoints, built once; rstrip avoids "//api" when CANVAS_BASE ends with a slash.
+_API = CANVAS_BASE.rstrip("/") + "/api/v1/"
+_GRAPHQL_URL = CANVAS_BASE.rstrip("/") + "/api/graphql"
+
+_COURSES_URL = _API + "users/self/favorites/courses?per_page=100&include[]=term"
+_SELF_URL = _API + "users/self"
+_PERIODS_FMT = _API + "courses/%d/grading_periods"
+# Description and rubric are the bulkiest assignment fields and are never read.
+_ASSIGN_FMT = (
+    _API + "courses/%d/assignments?include[]=submission&per_page=100"
+    "&exclude_response_fields[]=description&exclude_response_fields[]=rubric"
+)
+
+_RETRY = Retry(total=3, backoff_factor=0.2, status_forcelist=[429, 500, 502, 503, 504])
+
+# One pooled session for every Canvas/Discord call so TLS connections are reused.
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=50, pool_maxsize=50, max_retries=_RETRY))
+
+# Upper bound on in-flight Canvas requests; matches the connection pool limits below.
+# Canvas charges each in-flight request ~50 units against a ~700-unit throttle
+# bucket and rejects throttled requests with 403, so stay well under 14.
+_MAX_CONCURRENCY = 8
+
+# Canvas serves HTTP/2; with httpx (and h2) installed, multiplex every Canvas
+# request from the worker threads over a single connection.
+_CANVAS = _SESSION
+if httpx:
+    try:
+        _CANVAS = httpx.Client(
+            timeout=15,
+            follow_redirects=True,
+            transport=httpx.HTTPTransport(
+                http2=True,
+                retries=_RETRY.total,  # connection errors; statuses are retried in _canvas_get
+                limits=httpx.Limits(
+                    max_connections=_MAX_CONCURRENCY,
+                    max_keepalive_connections=_MAX_CONCURRENCY,
+                ),
+            ),
+        )
+    except ImportError:  # http2=True needs the h2 package
+        pass
+
+
+# -----------------------------
+# Basic HTTP helpers
+# -----------------------------
+
+def _parse_iso(s):
+    # Canvas timestamps are ISO-8601 with a trailing "Z"; normalize for fromisoformat.
+    return datetime.fromisoformat(s.replace("Z", "+00:00"))
+
+
+def _loads(r):
+    return orjson.loads(r.content) if orjson else r.json()
+
+
+def _canvas_get(url, headers):
+    r = _CANVAS.get(url, headers=headers, timeout=15)
+    if _CANVAS is _SESSION:
+        return r  # the mounted adapter already applies _RETRY
+
+    # httpx has no status-based retries; mirror _RETRY's statuses and backoff.
+    for attempt in range(_RETRY.total):
+        if r.status_code not in _RETRY.status_forcelist:
+            break
+        try:
+            delay = float(r.headers.get("Retry-After"))
+        except (TypeError, ValueError):
+            delay = _RETRY.backoff_factor * (2 ** attempt)
+        time.sleep(delay)
+        r = _CANVAS.get(url, headers=headers, timeout=15)
+    return r
+
+
+def request_json(url):
+    try:
+        r = _canvas_get(url, HEADERS)
+        r.raise_for_status()
+        return _loads(r), r
+    except Exception as e:
+        raise RuntimeError(f"Request failed: {url} | {e}")
+
+
+def _graphql(query, variables):
+    try:
+        r = _CANVAS.post(
+            _GRAPHQL_URL,
+            json={"query": query, "variables": variables},
+            headers=HEADERS,
+            timeout=15,
+        )
+        r.raise_for_status()
+        payload = _loads(r)
+    except Exception as e:
+        raise RuntimeError(f"GraphQL request failed: {e}")
+
+    if payload.get("errors") or not payload.get("data"):
+        raise RuntimeError(f"GraphQL request failed: {payload.get('errors')}")
+    return payload["data"]
+
+
+def iter_pages(url):
+    """
+    Yields items one page at a time, so callers can filter each page
+    without holding every page in memory.
+    """
+    while url:
+        data, r = request_json(url)
+        yield from (data if isinstance(data, list) else [data])
+        url = r.links.get("next", {}).get("url")
+
+
+def get_all_pages(url):
+    return list(iter_pages(url))
+
+
+def get_courses():
+    return get_all_pages(_COURSES_URL)
+
+
+# -----------------------------
+# Grading period helpers
+# -----------------------------
+
+_Q34_RE = re.compile(r"Q[34]|QUARTER\s*[34]|[34](?:RD|TH)\s+QUARTER", re.IGNORECASE)
+
+
+def _is_q3_q4(title):
+    return bool(title) and _Q34_RE.search(title) is not None
+
+
+# On-disk ETag cache so unchanged grading periods cost a 304 instead of a full body.
+_PERIODS_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".cache", "canvas-reminder", "periods.json")
+_PERIODS_CACHE_LOCK = threading.Lock()
+_periods_cache = None
+_periods_cache_dirty = False
+
+
+def _load_periods_cache():
+    global _periods_cache
+    if _periods_cache is None:
+        try:
+            with open(_PERIODS_CACHE_PATH, encoding="utf-8") as f:
+                _periods_cache = json.load(f)
+        except (OSError, ValueError):
+            _periods_cache = {}
+        if not isinstance(_periods_cache, dict):
+            _periods_cache = {}
+    return _periods_cache
+
+
+def _cached_periods(url):
+    # Anything other than {"etag": str, "payload": ...} is treated as a miss.
+    with _PERIODS_CACHE_LOCK:
+        entry = _load_periods_cache().get(url)
+    if isinstance(entry, dict) and isinstance(entry.get("etag"), str) and "payload" in entry:
+        return entry
+    return None
+
+
+def _save_periods_cache():
+    global _periods_cache_dirty
+    with _PERIODS_CACHE_LOCK:
+        if not _periods_cache_dirty:
+            return
+        try:
+            os.makedirs(os.path.dirname(_PERIODS_CACHE_PATH), exist_ok=True)
+            tmp = _PERIODS_CACHE_PATH + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(_periods_cache, f)
+            os.replace(tmp, _PERIODS_CACHE_PATH)
+            _periods_cache_dirty = False
+        except OSError:
+            pass
+
+
+def _request_grading_periods(url):
+    global _periods_cache_dirty
+    cached = _cached_periods(url)
+
+    headers = dict(HEADERS)
+    if cached:
+        headers["If-None-Match"] = cached["etag"]
+
+    try:
+        r = _canvas_get(url, headers)
+        if r.status_code == 304 and cached:
+            return cached["payload"]
+        r.raise_for_status()
+        payload = _loads(r)
+    except Exception as e:
+        raise RuntimeError(f"Request failed: {url} | {e}")
+
+    etag = r.headers.get("ETag")
+    if etag:
+        with _PERIODS_CACHE_LOCK:
+            _load_periods_cache()[url] = {"etag": etag, "payload": payload}
+            _periods_cache_dirty = True
+    return payload
+
+
+# Cached so the id and date-range helpers share one grading_periods request per course.
+@lru_cache(maxsize=256)
+def _get_q3_q4_periods(course_id):
+    payload = _request_grading_periods(_PERIODS_FMT % course_id)
+    periods = payload.get("grading_periods", payload) if isinstance(payload, dict) else payload
+    return tuple(p for p in periods if _is_q3_q4(p.get("title")))
+
+
+def get_q3_q4_period_ids(course_id):
+    return [p["id"] for p in _get_q3_q4_periods(course_id) if "id" in p]
+
+
+def get_q3_q4_date_ranges(course_id):
+    out = []
+    for p in _get_q3_q4_periods(course_id):
+        s, e = p.get("start_date"), p.get("end_date")
+        if s and e:
+            try:
+                out.append((_parse_iso(s), _parse_iso(e)))
+            except Exception:
+                pass
+    return out
+
+
+def _epoch_us(dt):
+    return round(dt.timestamp() * 1_000_000)
+
+
+def _range_index(ranges):
+    """
+    Turns (start, end) datetime pairs into sorted, merged (starts, ends)
+    lists of epoch microseconds for bisect lookups.
+    """
+    starts, ends = [], []
+    for s, e in sorted((_epoch_us(s), _epoch_us(e)) for s, e in ranges):
+        if ends and s <= ends[-1]:
+            ends[-1] = max(ends[-1], e)
+        else:
+            starts.append(s)
+            ends.append(e)
+    return starts, ends
+
+
+# -----------------------------
+# Core filtering logic
+# -----------------------------
+
+def should_include_assignment(a, period_ids, ranges, low_score_threshold_percent=50.0):
+    ag = a.get
+    sub = ag("submission") or {}
+    sg = sub.get
+
+    # Cheap checks first: only missing or low-scoring work can qualify.
+    if not sg("missing"):
+        score, points = sg("score"), ag("points_possible")
+        if score is None or not points:
+            return False
+        # Cross-multiplied percent check; points is non-zero here.
+        if score * 100.0 > points * low_score_threshold_percent:
+            return False
+
+    # Does it belong to Q3/Q4? Only parse the due date if the period id doesn't match.
+    gp = ag("grading_period_id")
+    if gp is not None and gp in period_ids:
+        return True
+
+    starts, ends = ranges
+    due = ag("due_at")
+    if not starts or not due:
+        return False
+
+    try:
+        d = _epoch_us(_parse_iso(due))
+    except Exception:
+        return False
+    i = bisect_right(starts, d) - 1
+    return i >= 0 and d <= ends[i]
+
+
+# Canvas applies default filters to both connections: without the explicit null
+# gradingPeriodId only the current period is returned, and without listing
+# unsubmitted among the states, never-submitted (i.e. missing) work has no
+# submission node at all.
+_ASSIGNMENTS_QUERY = """
+query($id: ID!, $after: String) {
+  course(id: $id) {
+    assignmentsConnection(first: 100, after: $after, filter: {gradingPeriodId: null}) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        _id name pointsPossible dueAt htmlUrl gradingPeriodId
+        submissionsConnection(filter: {states: [unsubmitted, submitted, pending_review, graded]}) {
+          nodes { score missing late user { _id } }
+        }
+      }
+    }
+  }
+}
+"""
+
+
+@lru_cache(maxsize=1)
+def _self_user_id():
+    user, _ = request_json(_SELF_URL)
+    return str(user["id"])
+
+
+def _graphql_assignment(node, user_id):
+    """
+    Adapts a GraphQL assignment node to the REST shape used by the filters.
+    Only the token owner's submission is kept, matching REST include[]=submission.
+    """
+    subs = (node.get("submissionsConnection") or {}).get("nodes") or []
+    own = next((s for s in subs if ((s.get("user") or {}).get("_id")) == user_id), None)
+    gp = node.get("gradingPeriodId")
+    return {
+        "id": int(node["_id"]),
+        "name": node.get("name"),
+        "points_possible": node.get("pointsPossible"),
+        "due_at": node.get("dueAt"),
+        "html_url": node.get("htmlUrl"),
+        "grading_period_id": int(gp) if gp is not None else None,
+        "submission": {k: own.get(k) for k in ("score", "missing", "late")} if own else {},
+    }
+
+
+def _get_assignments_graphql(course_id):
+    user_id = _self_user_id()
+    out, after = [], None
+    while True:
+        course = _graphql(_ASSIGNMENTS_QUERY, {"id": str(course_id), "after": after})["course"]
+        if not course:
+            raise RuntimeError(f"GraphQL request failed: course {course_id} not found")
+        conn = course["assignmentsConnection"]
+        out.extend(_graphql_assignment(n, user_id) for n in conn["nodes"])
+        if not conn["pageInfo"]["hasNextPage"]:
+            return out
+        after = conn["pageInfo"]["endCursor"]
+
+
+@lru_cache(maxsize=256)
+def _period_filters(course_id):
+    return frozenset(get_q3_q4_period_ids(course_id)), _range_index(get_q3_q4_date_ranges(course_id))
+
+
+def _term_period_courses(courses):
+    """
+    Maps each course id to the course whose grading periods it should use.
+    Courses in the same term share the first such course, so the periods
+    are fetched and parsed once per term.
+    """
+    by_term, out = {}, {}
+    for c in courses:
+        term_id = (c.get("term") or {}).get("id")
+        out[c["id"]] = c["id"] if term_id is None else by_term.setdefault(term_id, c["id"])
+    return out
+
+
+def get_assignments(course_id, periods_course_id=None):
+    pids, ranges = _period_filters(periods_course_id or course_id)
+
+    if not pids and not ranges[0]:
+        return []
+
+    # One GraphQL query per course; fall back to paginated REST if it is unavailable.
+    try:
+        assignments = _get_assignments_graphql(course_id)
+    except RuntimeError:
+        assignments = iter_pages(_ASSIGN_FMT % course_id)
+
+    return [a for a in assignments if should_include_assignment(a, pids, ranges)]
+
+
+# -----------------------------
+# Structured output (list-based)
+# -----------------------------
+
+if msgspec:
+    # Fixed schema, so msgspec can encode records without reflecting on dict keys.
+    class Record(msgspec.Struct):
+        course_id: int | None
+        course_name: str
+        assignment_id: int | None
+        assignment_name: str
+        status: str
+        score: float | None
+        points_possible: float | None
+        percent: float | None
+        due_at: str | None
+        url: str | None
+else:
+    Record = namedtuple(
+        "Record",
+        "course_id course_name assignment_id assignment_name status score points_possible percent due_at url",
+    )
+
+
+def _assignment_to_record(course, a):
+    sub = a.get("submission") or {}
+    name = a.get("name", "Unnamed Assignment")
+    score, pts = sub.get("score"), a.get("points_possible")
+
+    percent = None
+    if score is not None and pts:
+        try:
+            percent = round((score / pts) * 100, 2)
+        except Exception:
+            pass
+
+    if sub.get("missing"):
+        status = "missing"
+    elif sub.get("late"):
+        status = "late"
+    else:
+        status = "low_score"
+
+    return Record(
+        course_id=course.get("id"),
+        course_name=course.get("name", "Unnamed Course"),
+        assignment_id=a.get("id"),
+        assignment_name=name,
+        status=status,
+        score=score,
+        points_possible=pts,
+        percent=percent,
+        due_at=a.get("due_at"),
+        url=a.get("html_url"),
+    )
+
+
+def collect_results():
+    """
+    Returns a list of Record objects, each representing an assignment.
+    This is the function you would call from a messaging / notification system.
+    """
+    results = []
+
+    courses = get_courses()
+
+    periods_for = _term_period_courses(courses)
+
+    # Per-course fetches are independent and network-bound; keep them all in flight at once.
+    with ThreadPoolExecutor(max_workers=max(1, min(_MAX_CONCURRENCY, len(courses)))) as pool:
+        # Warm the per-term grading period cache first so courses don't race to fetch it.
+        warm = {cid: pool.submit(_period_filters, cid) for cid in set(periods_for.values())}
+        failed = set()
+        for cid, f in warm.items():
+            try:
+                f.result()
+            except RuntimeError:
+                failed.add(cid)
+
+        jobs = []
+        for c in courses:
+            cid = c["id"]
+            if cid in failed:
+                continue
+            # A failed shared lookup only skips that course; its term siblings use their own periods.
+            periods_cid = cid if periods_for[cid] in failed else periods_for[cid]
+            jobs.append((c, pool.submit(get_assignments, cid, periods_cid)))
+
+        for c, f in jobs:
+            try:
+                assignments = f.result()
+            except RuntimeError:
+                continue
+
+            for a in assignments:
+                results.append(_assignment_to_record(c, a))
+
+    _save_periods_cache()
+    return results
+
+
+# -----------------------------
+# Discord webhook integration
+# -----------------------------
+
+def _format_percent(record):
+    percent = record.percent
+    if percent is None:
+        return "N/A"
+    return f"{percent:.2f}%"
+
+
+def _format_assignment_line(record):
+    status = (record.status or "unknown").replace("_", " ")
+    course = record.course_name or "Unnamed Course"
+    name = record.assignment_name or "Unnamed Assignment"
+    percent = _format_percent(record)
+    url = record.url
+
+    line = f"**{course}** — {name} ({status}, {percent})"
+    if url:
+        line += f" <{url}>"
+    return line
+
+
+def _chunk_lines(lines, max_len=1900):
+    if not lines:
+        return []
+
+    # Find cut points in one pass, then join each slice once.
+    cuts = []
+    start = running = 0
+    for i, line in enumerate(lines):
+        line_len = len(line) + 1
+        if i > start and running + line_len > max_len:
+            cuts.append((start, i))
+            start, running = i, 0
+        running += line_len
+    cuts.append((start, len(lines)))
+
+    return ["\n".join(lines[a:b]) for a, b in cuts]
+
+
+def _post_webhook(payload):
+    r = _SESSION.post(DISCORD_WEBHOOK_URL, json=payload, timeout=15)
+    if r.status_code == 429:
+        # Rate limited: honor Retry-After once, then resend this payload.
+        time.sleep(float(r.headers.get("Retry-After", 1)))
+        r = _SESSION.post(DISCORD_WEBHOOK_URL, json=payload, timeout=15)
+    r.raise_for_status()
+    return r
+
+
+def _build_payloads(records):
+    if not records:
+        return [{"content": "✅ No missing or below 50% assignments found."}]
+
+    chunks = _chunk_lines([_format_assignment_line(r) for r in records])
+    if len(chunks) == 1:
+        return [{"content": chunks[0]}]
+
+    # Chunks are posted concurrently and may land out of order; label each part.
+    n = len(chunks)
+    return [{"content": f"({i}/{n})\n{chunk}"} for i, chunk in enumerate(chunks, 1)]
+
+
+def send_discord_notifications(records):
+    if not DISCORD_WEBHOOK_URL:
+        return
+
+    payloads = _build_payloads(records)
+
+    with ThreadPoolExecutor(max_workers=min(4, len(payloads))) as pool:
+        futures = [pool.submit(_post_webhook, payload) for payload in payloads]
+
+        for f in futures:
+            try:
+                f.result()
+            except Exception as e:
+                raise RuntimeError(f"Discord webhook failed: {e}")
+
+
+def _record_dict(record):
+    return msgspec.structs.asdict(record) if msgspec else record._asdict()
+
+
+def _dump_records(records):
+    """
+    Returns records as 2-space indented UTF-8 JSON. Every backend produces
+    the same bytes, so output doesn't depend on which optional packages are installed.
+    """
+    if msgspec:
+        return msgspec.json.format(msgspec.json.encode(records), indent=2)
+    data = [_record_dict(r) for r in records]
+    if orjson:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2, ensure_ascii=False).encode()
+
+
+# -----------------------------
+# CLI (still works, but now prints JSON list)
+# -----------------------------
+
+def main():
+    try:
+        records = collect_results()
+    except RuntimeError as e:
+        print("ERROR:", e)
+        return 1
+
+    # Send to Discord in the background while the JSON is serialized and printed.
+    errors = []
+
+    def notify():
+        try:
+            send_discord_notifications(records)
+        except Exception as e:
+            errors.append(e)
+
+    t = threading.Thread(target=notify)
+    t.start()
+
+    # Pretty JSON output for easy piping to other tools
+    sys.stdout.buffer.write(_dump_records(records) + b"\n")
+    sys.stdout.buffer.flush()
+
+    t.join()
+    if errors:
+        raise errors[0]
+    return 0
+
+
+# -----------------------------
+# Tests (filtering, parsing, Canvas adapters and output)
+# -----------------------------
+
+class TestFiltering(unittest.TestCase):
+    def setUp(self):
+        self.period_ids = {1}
+        self.ranges = _range_index([(
+            _parse_iso("2025-01-01T00:00:00Z"),
+            _parse_iso("2025-03-31T23:59:59Z"),
+        )])
+
+    def test_missing_assignment_in_period(self):
+        a = {"grading_period_id": 1, "submission": {"missing": True}, "points_possible": 10}
+        self.assertTrue(should_include_assignment(a, self.period_ids, self.ranges))
+
+    def test_low_score_in_period(self):
+        a = {"grading_period_id": 1, "submission": {"missing": False, "score": 4}, "points_possible": 10}
+        self.assertTrue(should_include_assignment(a, self.period_ids, self.ranges))
+
+    def test_good_score_excluded(self):
+        a = {"grading_period_id": 1, "submission": {"missing": False, "score": 9}, "points_possible": 10}
+        self.assertFalse(should_include_assignment(a, self.period_ids, self.ranges))
+
+    def test_wrong_period_excluded(self):
+        a = {"grading_period_id": 2, "submission": {"missing": True}, "points_possible": 10}
+        self.assertFalse(should_include_assignment(a, self.period_ids, self.ranges))
+
+    def test_due_date_fallback_in_range_missing(self):
+        a = {"grading_period_id": None, "due_at": "2025-02-15T12:00:00Z", "submission": {"missing": True}, "points_possible": 10}
+        self.assertTrue(should_include_assignment(a, self.period_ids, self.ranges))
+
+    def test_due_date_fallback_out_of_range_excluded(self):
+        a = {"grading_period_id": None, "due_at": "2024-10-15T12:00:00Z", "submission": {"missing": True}, "points_possible": 10}
+        self.assertFalse(should_include_assignment(a, self.period_ids, self.ranges))
+
+    def test_exactly_threshold_included(self):
+        a = {"grading_period_id": 1, "submission": {"missing": False, "score": 5}, "points_possible": 10}
+        self.assertTrue(should_include_assignment(a, self.period_ids, self.ranges))
+
+    def test_ungraded_not_missing_excluded(self):
+        a = {"grading_period_id": 1, "submission": {"missing": False, "score": None}, "points_possible": 10}
+        self.assertFalse(should_include_assignment(a, self.period_ids, self.ranges))
+
+    def test_points_missing_excluded(self):
+        a = {"grading_period_id": 1, "submission": {"missing": False, "score": 0}}
+        self.assertFalse(should_include_assignment(a, self.period_ids, self.ranges))
+
+    # New test (edge case): due date in range but not missing and >50% should be excluded
+    def test_due_date_in_range_but_good_score_excluded(self):
+        a = {
+            "grading_period_id": None,
+            "due_at": "2025-02-20T12:00:00Z",
+            "submission": {"missing": False, "score": 9},
+            "points_possible": 10,
+        }
+        self.assertFalse(should_include_assignment(a, self.period_ids, self.ranges))
+
+    def test_q3_q4_titles(self):
+        for title in ("Q3", "2025 q4", "Quarter 3", "4th Quarter", "3RD  QUARTER"):
+            self.assertTrue(_is_q3_q4(title), title)
+        for title in ("Q1", "Quarter 2", "Semester 1", "", None):
+            self.assertFalse(_is_q3_q4(title), title)
+
+    def test_range_index_merges_overlaps(self):
+        q3 = (_parse_iso("2025-01-01T00:00:00Z"), _parse_iso("2025-03-31T23:59:59Z"))
+        q4 = (_parse_iso("2025-04-01T00:00:00Z"), _parse_iso("2025-06-30T23:59:59Z"))
+        wide = (_parse_iso("2024-12-01T00:00:00Z"), _parse_iso("2025-02-01T00:00:00Z"))
+        starts, ends = _range_index([q4, q3, wide])
+        self.assertEqual(len(starts), 2)
+        self.assertEqual(starts[0], _epoch_us(wide[0]))
+        self.assertEqual(ends[0], _epoch_us(q3[1]))
+
+    def test_graphql_assignment_matches_rest_shape(self):
+        node = {
+            "_id": "42",
+            "name": "Essay",
+            "pointsPossible": 10.0,
+            "dueAt": "2025-02-15T12:00:00Z",
+            "htmlUrl": "https://example.test/assignment",
+            "gradingPeriodId": "1",
+            "submissionsConnection": {"nodes": [
+                {"score": 10.0, "missing": False, "late": False, "user": {"_id": "8"}},
+                {"score": 4.0, "missing": False, "late": False, "user": {"_id": "5"}},
+            ]},
+        }
+        a = _graphql_assignment(node, "5")
+        self.assertEqual(a["id"], 42)
+        self.assertEqual(a["grading_period_id"], 1)
+        self.assertEqual(a["submission"], {"score": 4.0, "missing": False, "late": False})
+        self.assertTrue(should_include_assignment(a, self.period_ids, self.ranges))
+        self.assertEqual(_graphql_assignment(node, "9")["submission"], {})
+
+    def test_graphql_query_includes_unsubmitted_work(self):
+        # Missing work is unsubmitted; Canvas's default submission states would omit it.
+        query = " ".join(_ASSIGNMENTS_QUERY.split())
+        self.assertIn("submissionsConnection(filter: {states: [unsubmitted,", query)
+        self.assertIn("filter: {gradingPeriodId: null}", query)
+
+    def test_chunk_lines_respects_max_len(self):
+        lines = ["x" * 9] * 5
+        self.assertEqual(_chunk_lines(lines, max_len=25), ["x" * 9 + "\n" + "x" * 9] * 2 + ["x" * 9])
+        self.assertEqual(_chunk_lines(["y" * 30], max_len=25), ["y" * 30])
+        self.assertEqual(_chunk_lines([]), [])
+
+    def test_term_period_courses_share_by_term(self):
+        courses = [
+            {"id": 10, "term": {"id": 1}},
+            {"id": 11, "term": {"id": 1}},
+            {"id": 12, "term": {"id": 2}},
+            {"id": 13},
+        ]
+        self.assertEqual(_term_period_courses(courses), {10: 10, 11: 10, 12: 12, 13: 13})
+
+    def test_build_payloads_labels_parts(self):
+        record = _assignment_to_record({"id": 1, "name": "Biology"}, {"id": 2, "name": "x" * 1000, "submission": {"missing": True}})
+        payloads = _build_payloads([record] * 3)
+        self.assertEqual(len(payloads), 3)
+        self.assertTrue(payloads[0]["content"].startswith("(1/3)\n"))
+        self.assertTrue(payloads[2]["content"].startswith("(3/3)\n"))
+        self.assertTrue(all(len(p["content"]) <= 2000 for p in payloads))
+        self.assertNotIn("(1/1)", _build_payloads([record])[0]["content"])
+
+    def test_graphql_assignments_follow_cursor(self):
+        def page(ids, has_next, cursor):
+            nodes = [{"_id": str(i), "name": f"A{i}"} for i in ids]
+            return {"course": {"assignmentsConnection": {
+                "pageInfo": {"hasNextPage": has_next, "endCursor": cursor},
+                "nodes": nodes,
+            }}}
+
+        pages = {None: page([1, 2], True, "c1"), "c1": page([3], False, None)}
+        seen = []
+
+        def fake_graphql(query, variables):
+            seen.append(variables["after"])
+            return pages[variables["after"]]
+
+        with mock.patch(__name__ + "._graphql", fake_graphql), mock.patch(__name__ + "._self_user_id", lambda: "5"):
+            out = _get_assignments_graphql(7)
+        self.assertEqual([a["id"] for a in out], [1, 2, 3])
+        self.assertEqual(seen, [None, "c1"])
+
+    def test_graphql_missing_course_raises(self):
+        with mock.patch(__name__ + "._graphql", lambda q, v: {"course": None}), \
+                mock.patch(__name__ + "._self_user_id", lambda: "5"):
+            with self.assertRaises(RuntimeError):
+                _get_assignments_graphql(7)
+
+    def test_json_output_matches_across_serializers(self):
+        record = _assignment_to_record(
+            {"id": 1, "name": "Chem ü"},
+            {"id": 2, "name": "Lab", "points_possible": 10, "submission": {"score": 4}},
+        )
+        expected = json.dumps([_record_dict(record)], indent=2, ensure_ascii=False).encode()
+        self.assertIn("Chem ü".encode(), expected)
+        self.assertEqual(_dump_records([record]), expected)
+        if orjson:
+            self.assertEqual(orjson.dumps([_record_dict(record)], option=orjson.OPT_INDENT_2), expected)
+        self.assertEqual(_dump_records([]), b"[]")
+
+    def test_malformed_periods_cache_is_a_miss(self):
+        global _periods_cache
+        url = "https://example.test/periods"
+        bad_files = ["[]", '{"%s": []}' % url, '{"%s": {"payload": []}}' % url, '{"%s": {"etag": 1, "payload": []}}' % url]
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "periods.json")
+            try:
+                for text in bad_files:
+                    with open(path, "w", encoding="utf-8") as f:
+                        f.write(text)
+                    _periods_cache = None
+                    with mock.patch(__name__ + "._PERIODS_CACHE_PATH", path):
+                        self.assertIsNone(_cached_periods(url), text)
+            finally:
+                _periods_cache = None
+
+    def test_canvas_get_retries_transient_statuses_off_session(self):
+        class Resp:
+            def __init__(self, status):
+                self.status_code, self.headers = status, {}
+
+        statuses = iter([503, 429, 200])
+        client = mock.Mock()
+        client.get.side_effect = lambda *a, **kw: Resp(next(statuses))
+        with mock.patch(__name__ + "._CANVAS", client), mock.patch("time.sleep") as sleep:
+            self.assertEqual(_canvas_get("https://example.test", HEADERS).status_code, 200)
+        self.assertEqual(client.get.call_count, 3)
+        self.assertEqual(sleep.call_count, 2)
+
+    def test_failed_term_lookup_falls_back_per_course(self):
+        courses = [{"id": 10, "term": {"id": 1}}, {"id": 11, "term": {"id": 1}}, {"id": 12, "term": {"id": 1}}]
+        lookups, fetched = [], []
+
+        def fake_filters(course_id):
+            lookups.append(course_id)
+            if course_id == 10:
+                raise RuntimeError("grading periods unavailable")
+            return frozenset({1}), ([], [])
+
+        def fake_assignments(course_id, periods_course_id=None):
+            fetched.append((course_id, periods_course_id))
+            return [{"id": course_id, "submission": {"missing": True}}]
+
+        with mock.patch(__name__ + ".get_courses", lambda: courses), \
+                mock.patch(__name__ + "._period_filters", fake_filters), \
+                mock.patch(__name__ + ".get_assignments", fake_assignments), \
+                mock.patch(__name__ + "._save_periods_cache"):
+            records = collect_results()
+
+        self.assertEqual(lookups, [10])
+        self.assertEqual(sorted(fetched), [(11, 11), (12, 12)])
+        self.assertEqual([r.course_id for r in records], [11, 12])
+
+    def test_format_assignment_line(self):
+        record = Record(
+            course_id=1,
+            course_name="Biology",
+            assignment_id=2,
+            assignment_name="Lab Report",
+            status="missing",
+            score=None,
+            points_possible=10,
+            percent=None,
+            due_at=None,
+            url="https://example.test/assignment",
+        )
+        line = _format_assignment_line(record)
+        self.assertIn("Biology", line)
+        self.assertIn("Lab Report", line)
+        self.assertIn("missing", line)
+        self.assertIn("N/A", line)
+        self.assertIn("https://example.test/assignment", line)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,28 @@
+# check_assignments.py
+# Daily entry point: reuses canvas_reminder for fetching, filtering and Discord delivery.
+
+from canvas_reminder import collect_results, send_discord_notifications
+
+
+def find_bad_assignments():
+    return collect_results()
+
+
+def send_to_discord(records):
+    send_discord_notifications(records)
+
+
+def main():
+    try:
+        records = find_bad_assignments()
+    except RuntimeError as e:
+        print("ERROR:", e)
+        return 1
+
+    send_to_discord(records)
+    print(f"Found {len(records)} missing or low-score assignment(s).")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())